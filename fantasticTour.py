@@ -1,54 +1,328 @@
 import os
-from dotenv import load_dotenv
+import atexit
+import socket
+import sqlite3
+import time
+import json
+import re
+import heapq
+import importlib.util
+import logging
 import customtkinter as ctk
 import tkinter
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import urllib.parse
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
 from tkinter import messagebox
-import webbrowser
 
 try:
-    import tkintermapview
-    MAP_AVAILABLE = True
+    import orjson
+    json_loads = orjson.loads
 except ImportError:
-    MAP_AVAILABLE = False
+    json_loads = json.loads
+
+try:
+    import brotli  # noqa: F401 - lets urllib3 decode br-encoded responses
+    ACCEPT_ENCODING = "gzip, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip"
+
+# tkintermapview is imported when the first route is drawn, not at startup.
+MAP_AVAILABLE = importlib.util.find_spec("tkintermapview") is not None
+if not MAP_AVAILABLE:
     print("Note: Install tkintermapview for embedded maps: pip install tkintermapview")
 
-load_dotenv()
+# .env is only parsed when one of its keys is missing from the environment
+if not (os.environ.get("GRAPHHOPPER_API_KEY") and os.environ.get("GOOGLE_MAPS_API_KEY")):
+    from dotenv import load_dotenv
+    load_dotenv()
 GRAPHOPPER_API_KEY = os.getenv("GRAPHHOPPER_API_KEY")
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
+GEOCODE_TIMEOUT = (3.0, 7.0)
+ROUTE_TIMEOUT = (3.0, 12.0)
+MAX_RESPONSE_BYTES = 2_000_000
+GRAPHHOPPER_HOST = "graphhopper.com"
+MAX_PATH_POINTS = 500
+CACHE_DIR = os.path.expanduser("~/.cache/route_api")
+CACHE_TTL = 86400
+
+def decode_polyline(encoded, multiplier=1e5):
+    """Decode a GraphHopper/Google encoded polyline into [lng, lat] pairs."""
+    coordinates = []
+    index = lat = lng = 0
+    length = len(encoded)
+    while index < length:
+        for axis in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            delta = ~(result >> 1) if result & 1 else result >> 1
+            if axis == 0:
+                lat += delta
+            else:
+                lng += delta
+        coordinates.append([lng / multiplier, lat / multiplier])
+    return coordinates
+
+def _farthest_point(points, first, last):
+    """Index and squared distance of the point furthest from the first-last segment."""
+    x1, y1 = points[first][0], points[first][1]
+    x2, y2 = points[last][0], points[last][1]
+    dx, dy = x2 - x1, y2 - y1
+    seg_len2 = dx * dx + dy * dy
+    best_index, best_dist = first + 1, -1.0
+    for i in range(first + 1, last):
+        px, py = points[i][0] - x1, points[i][1] - y1
+        if seg_len2 == 0:
+            dist = px * px + py * py
+        else:
+            t = (px * dx + py * dy) / seg_len2
+            if t < 0.0:
+                t = 0.0
+            elif t > 1.0:
+                t = 1.0
+            ex, ey = px - t * dx, py - t * dy
+            dist = ex * ex + ey * ey
+        if dist > best_dist:
+            best_index, best_dist = i, dist
+    return best_index, best_dist
+
+def simplify_path(points, max_points=MAX_PATH_POINTS):
+    """Ramer-Douglas-Peucker simplification down to at most max_points.
+
+    Segments are split at their most deviating point, largest deviation
+    first, so turns survive and straight runs collapse to their endpoints.
+    """
+    if len(points) <= max_points:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    heap = []
+
+    def split(first, last):
+        if last - first > 1:
+            index, dist = _farthest_point(points, first, last)
+            heapq.heappush(heap, (-dist, first, last, index))
+
+    split(0, len(points) - 1)
+    kept = 2
+    while heap and kept < max_points:
+        _, first, last, index = heapq.heappop(heap)
+        keep[index] = True
+        kept += 1
+        split(first, index)
+        split(index, last)
+    return [point for point, kept_point in zip(points, keep) if kept_point]
+
+class DiskCache:
+    """SQLite-backed key/value store so lookups survive between runs."""
+    def __init__(self, path, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+        self._conn.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+        self._conn.commit()
+
+    def get(self, key):
+        """Return (seconds left, value) for a live entry, or None; expired rows are deleted."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        if row is None:
+            return None
+        return row[1] - now, json_loads(row[0])
+
+    def set(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                               (key, json.dumps(value), time.time() + self.ttl))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
 class RouteAPI:
-    def __init__(self):
-        self.route_url = "https://graphhopper.com/api/1/route?"
-        self.geocode_url = "https://graphhopper.com/api/1/geocode?"
+    _BAD_CHARS_RE = re.compile(r"[<>;|&$]")
+    _VEHICLES = ('car', 'bike', 'foot')
+    _VALID_VEHICLES = frozenset(_VEHICLES)
+    _VEHICLE_ERROR = f"Invalid vehicle type. Must be one of: {', '.join(_VEHICLES)}"
+    _STATUS_MSG = {
+        401: "Invalid API key. Please check your .env file.",
+        403: "API key is not allowed to use this service.",
+        429: "API rate limit reached. Please wait a moment and try again."
+    }
+
+    def __init__(self, cache_dir=CACHE_DIR, session=None):
+        self._owns_session = session is None
+        self._route_url = "https://graphhopper.com/api/1/route?"
+        self._geocode_url = "https://graphhopper.com/api/1/geocode?"
         self.key = GRAPHOPPER_API_KEY
+        if session is None:
+            session = requests.Session()
+            # Only 429/5xx responses are retried; timeouts surface at once as ConnectTimeout/ReadTimeout.
+            retries = Retry(total=3, connect=0, read=False, status=3,
+                            backoff_factor=0.5, backoff_max=8, backoff_jitter=0.5,
+                            status_forcelist=(429, 500, 502, 503, 504), raise_on_status=False)
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+            session.headers.update({
+                "Connection": "keep-alive",
+                "Accept-Encoding": ACCEPT_ENCODING,
+                "Accept": "application/json",
+                "User-Agent": "FantasticTour/1.0",
+            })
+        self.session = session
+        self._geo_cache = OrderedDict()
+        self._geo_cache_size = 1024
+        self._cache_lock = threading.Lock()
+        self._route_cache = OrderedDict()
+        self._route_cache_size = 64
+        self._disk_cache = None
+        if cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self._disk_cache = DiskCache(os.path.join(cache_dir, "cache.sqlite3"))
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Cache Warning] Disk cache disabled: {e}")
+        self._geocode_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="route-api")
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def close(self):
+        """Release pooled connections and the disk cache; an injected session is left to its owner."""
+        self._geocode_pool.shutdown(wait=False)
+        if self._owns_session:
+            self.session.close()
+        if self._disk_cache is not None:
+            self._disk_cache.close()
+
+    def warm_up(self):
+        """Start resolving the API host and opening a pooled TLS connection in the background."""
+        threading.Thread(target=self._warm_connection, daemon=True).start()
+
+    def _warm_connection(self):
+        try:
+            socket.getaddrinfo(GRAPHHOPPER_HOST, 443, type=socket.SOCK_STREAM)
+            self.session.head(f"https://{GRAPHHOPPER_HOST}/", timeout=GEOCODE_TIMEOUT)
+        except (OSError, requests.exceptions.RequestException):
+            pass
+
+    @property
+    def key(self):
+        return self._key
+
+    @key.setter
+    def key(self, value):
+        self._key = value
+        self._key_check = self._check_api_key(value)
+        self._key_q = urllib.parse.quote(value, safe="") if isinstance(value, str) else ""
+        self._rebuild_prefixes()
+
+    @property
+    def geocode_url(self):
+        return self._geocode_url
+
+    @geocode_url.setter
+    def geocode_url(self, value):
+        self._geocode_url = value
+        self._rebuild_prefixes()
+
+    @property
+    def route_url(self):
+        return self._route_url
+
+    @route_url.setter
+    def route_url(self, value):
+        self._route_url = value
+        self._rebuild_prefixes()
+
+    def _rebuild_prefixes(self):
+        """Precompute the fixed part of each request URL from the endpoints and key."""
+        self._geocode_prefix = f"{self._geocode_url}limit=1&key={self._key_q}&q="
+        self._route_prefix = {
+            v: f"{self._route_url}key={self._key_q}&vehicle={v}&points_encoded=true"
+            for v in self._VEHICLES
+        }
     
     def validate_api_key(self):
-        if not self.key:
+        return self._key_check
+
+    @staticmethod
+    def _check_api_key(key):
+        if not key:
             return {"status": "error", "message": "API key not found. Please check your .env file."}
-        if not isinstance(self.key, str) or len(self.key.strip()) == 0:
+        if not isinstance(key, str) or len(key.strip()) == 0:
             return {"status": "error", "message": "Invalid API key format."}
         return {"status": "success"}
     
     def validate_location_input(self, location):
-        if not location or not location.strip():
+        stripped = location.strip() if location else ""
+        if not stripped:
             return {"status": "error", "message": "Location cannot be empty."}
-        if len(location.strip()) < 2:
+        if len(stripped) < 2:
             return {"status": "error", "message": "Location must be at least 2 characters long."}
         if len(location) > 200:
             return {"status": "error", "message": "Location is too long (max 200 characters)."}
-        if any(char in location for char in ['<', '>', ';', '|', '&', '$']):
+        if self._BAD_CHARS_RE.search(location):
             return {"status": "error", "message": "Invalid characters in location."}
         return {"status": "success"}
     
     def validate_vehicle_type(self, vehicle):
-        valid_vehicles = ['car', 'bike', 'foot']
-        if vehicle not in valid_vehicles:
-            return {"status": "error", "message": f"Invalid vehicle type. Must be one of: {', '.join(valid_vehicles)}"}
+        if vehicle not in self._VALID_VEHICLES:
+            return {"status": "error", "message": self._VEHICLE_ERROR}
         return {"status": "success"}
 
+    def _cache_get(self, cache, key, max_size):
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is not None:
+                expires, value = entry
+                if time.monotonic() < expires:
+                    cache.move_to_end(key)
+                    return value
+                del cache[key]
+        if self._disk_cache is None:
+            return None
+        try:
+            hit = self._disk_cache.get(repr(key))
+        except sqlite3.Error:
+            return None
+        if hit is None:
+            return None
+        ttl, value = hit
+        self._cache_put(cache, key, value, max_size, persist=False, ttl=ttl)
+        return value
+
+    def _cache_put(self, cache, key, value, max_size, persist=True, ttl=None):
+        """Store value in memory (and on disk if persist); ttl defaults to CACHE_TTL."""
+        if ttl is None:
+            ttl = CACHE_TTL
+        with self._cache_lock:
+            cache[key] = (time.monotonic() + ttl, value)
+            cache.move_to_end(key)
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+        if persist and self._disk_cache is not None:
+            try:
+                self._disk_cache.set(repr(key), value)
+            except sqlite3.Error:
+                pass
+
     def geocode(self, location):
         validation_result = self.validate_location_input(location)
         if validation_result["status"] == "error":
@@ -56,54 +330,185 @@ class RouteAPI:
         api_key_check = self.validate_api_key()
         if api_key_check["status"] == "error":
             return api_key_check
-        url = self.geocode_url + urllib.parse.urlencode({
-            "q": location,
-            "limit": "1",
-            "key": self.key
-        })
+        cache_key = " ".join(location.strip().lower().split())
+        cached = self._cache_get(self._geo_cache, cache_key, self._geo_cache_size)
+        if cached is not None:
+            return cached
+        # The first caller for a key does the lookup; concurrent callers wait on its Future
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = self._inflight[cache_key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = self._geocode_and_store(location, cache_key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+
+    def _geocode_and_store(self, location, cache_key):
+        result = self._geocode_uncached(location)
+        if result["status"] == "success":
+            self._cache_put(self._geo_cache, cache_key, result, self._geo_cache_size)
+        return result
+
+    def geocode_many(self, locations):
+        """Geocode several locations concurrently; results come back in input order."""
+        return list(self._geocode_pool.map(self.geocode, locations))
+
+    def _geocode_uncached(self, location):
+        url = self._geocode_prefix + urllib.parse.quote(location, safe="")
         try:
-            response = requests.get(url, timeout=10)
-            if response.status_code != 200:
-                return {"status": "error", "message": f"API returned status code: {response.status_code}"}
-            data = response.json()
+            response = self.session.get(url, timeout=GEOCODE_TIMEOUT, stream=True)
+            response.raise_for_status()
+            content = self._read_body(response)
+            if content is None:
+                return {"status": "error", "message": "Geocoding response is too large."}
+            if not content:
+                return {"status": "error", "message": "Empty response from geocoding API."}
+            data = json_loads(content)
             if data.get("hits"):
                 point = data["hits"][0]["point"]
+                coord_error = self._validate_coord(point)
+                if coord_error:
+                    return {"status": "error", "message": coord_error}
                 name = data["hits"][0].get("name", "Unknown")
                 country = data["hits"][0].get("country", "")
                 state = data["hits"][0].get("state", "")
-                full_name = f"{name}, {state}, {country}".strip(", ")
+                full_name = ", ".join(part for part in (name, state, country) if part)
                 return {"status": "success", "lat": point["lat"], "lng": point["lng"], "name": full_name}
             else:
                 return {"status": "error", "message": f"No results found for '{location}'"}
-        except Exception as e:
-            return {"status": "error", "message": f"Unexpected error: {str(e)}"}
-
-    def get_route(self, start_coords, end_coords, vehicle):
-        if not all(isinstance(coord, dict) for coord in [start_coords, end_coords]):
-            return {"status": "error", "message": "Invalid coordinate data."}
-        if not all(key in start_coords for key in ['lat', 'lng']) or not all(key in end_coords for key in ['lat', 'lng']):
-            return {"status": "error", "message": "Missing coordinate data."}
-        if not all(-90 <= coord['lat'] <= 90 and -180 <= coord['lng'] <= 180 for coord in [start_coords, end_coords]):
-            return {"status": "error", "message": "Invalid coordinate values."}
+        except requests.exceptions.HTTPError as e:
+            return {"status": "error", "message": self._http_error_message("API", e.response)}
+        except json.JSONDecodeError:
+            return {"status": "error", "message": "Invalid JSON response from server."}
+        except requests.exceptions.ConnectTimeout:
+            return {"status": "error", "message": "Could not reach the geocoding server. Check your network."}
+        except requests.exceptions.ReadTimeout:
+            return {"status": "error", "message": "Geocoding server is responding slowly. Please try again."}
+        except requests.exceptions.RequestException as e:
+            return {"status": "error", "message": f"Network error: {e}"}
+        except (KeyError, TypeError, AttributeError):
+            return {"status": "error", "message": "Unexpected response format from geocoding API."}
+
+    @staticmethod
+    def _read_body(response):
+        """Read a streamed response body, or return None once it exceeds MAX_RESPONSE_BYTES."""
+        try:
+            declared = int(response.headers.get("Content-Length", "0"))
+        except ValueError:
+            declared = 0  # malformed header: rely on the streamed byte count below
+        if declared >= MAX_RESPONSE_BYTES:
+            response.close()
+            return None
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=65536):
+            body += chunk
+            if len(body) >= MAX_RESPONSE_BYTES:
+                response.close()
+                return None
+        return bytes(body)
+
+    @classmethod
+    def _http_error_message(cls, source, response):
+        known = cls._STATUS_MSG.get(response.status_code)
+        if known:
+            return known
+        # Error bodies are streamed too, so an oversized one is never loaded; fall back to the reason
+        body = cls._read_body(response)
+        try:
+            detail = (body and json_loads(body).get("message")) or response.reason
+        except (ValueError, AttributeError):  # not JSON, or JSON that isn't an object
+            detail = response.reason
+        return f"{source} returned status code {response.status_code}: {detail}"
+
+    @staticmethod
+    def _validate_coord(coord):
+        """Return an error message for a bad {"lat", "lng"} dict, or None if it is usable."""
+        if not isinstance(coord, dict):
+            return "Invalid coordinate data."
+        if 'lat' not in coord or 'lng' not in coord:
+            return "Missing coordinate data."
+        lat, lng = coord['lat'], coord['lng']
+        if not (isinstance(lat, (int, float)) and isinstance(lng, (int, float))):
+            return "Non-numeric coordinate."
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            return "Invalid coordinate values."
+        return None
+
+    def get_route(self, start_coords, end_coords, vehicle, summary_only=False):
+        return self.get_multi_route([start_coords, end_coords], vehicle, summary_only)
+
+    def get_multi_route(self, coords_list, vehicle, summary_only=False):
+        """Route through every point in order with a single GraphHopper request.
+
+        With summary_only, GraphHopper skips instructions and geometry and only
+        distance/time come back.
+        """
+        if not isinstance(coords_list, (list, tuple)) or len(coords_list) < 2:
+            return {"status": "error", "message": "At least two points are required."}
+        for coord in coords_list:
+            coord_error = self._validate_coord(coord)
+            if coord_error:
+                return {"status": "error", "message": coord_error}
         vehicle_validation = self.validate_vehicle_type(vehicle)
         if vehicle_validation["status"] == "error":
             return vehicle_validation
         api_key_check = self.validate_api_key()
         if api_key_check["status"] == "error":
             return api_key_check
-        op = f"&point={start_coords['lat']},{start_coords['lng']}"
-        dp = f"&point={end_coords['lat']},{end_coords['lng']}"
-        url = self.route_url + urllib.parse.urlencode({"key": self.key, "vehicle": vehicle, "points_encoded": "false"}) + op + dp
+        cache_key = tuple(round(c[axis], 4) for c in coords_list for axis in ('lat', 'lng')) + (vehicle,)
+        if summary_only:
+            cache_key += ("summary",)
+        cached = self._cache_get(self._route_cache, cache_key, self._route_cache_size)
+        if cached is not None:
+            return cached
+        result = self._get_route_uncached(coords_list, vehicle, summary_only)
+        if result["status"] == "success":
+            self._cache_put(self._route_cache, cache_key, result, self._route_cache_size)
+        return result
+
+    def _get_route_uncached(self, coords_list, vehicle, summary_only=False):
+        url = self._route_prefix[vehicle] + "".join(f"&point={c['lat']},{c['lng']}" for c in coords_list)
+        if summary_only:
+            url += "&instructions=false&calc_points=false"
         try:
-            response = requests.get(url, timeout=15)
-            if response.status_code != 200:
-                return {"status": "error", "message": f"Routing API returned status code: {response.status_code}"}
-            data = response.json()
+            response = self.session.get(url, timeout=ROUTE_TIMEOUT, stream=True)
+            response.raise_for_status()
+            content = self._read_body(response)
+            if content is None:
+                return {"status": "error", "message": "Routing response is too large."}
+            if not content:
+                return {"status": "error", "message": "Empty response from routing API."}
+            data = json_loads(content)
             if 'paths' not in data or not data['paths']:
                 return {"status": "error", "message": "No route path found in response."}
+            for path in data['paths']:
+                if isinstance(path.get("points"), str):
+                    multiplier = path.get("points_encoded_multiplier", 1e5)
+                    path["points"] = {"type": "LineString", "coordinates": decode_polyline(path["points"], multiplier)}
             return {"status": "success", "data": data}
-        except Exception as e:
-            return {"status": "error", "message": f"Unexpected routing error: {str(e)}"}
+        except requests.exceptions.HTTPError as e:
+            return {"status": "error", "message": self._http_error_message("Routing API", e.response)}
+        except json.JSONDecodeError:
+            return {"status": "error", "message": "Invalid JSON response from server."}
+        except requests.exceptions.ConnectTimeout:
+            return {"status": "error", "message": "Could not reach the routing server. Check your network."}
+        except requests.exceptions.ReadTimeout:
+            return {"status": "error", "message": "Routing server is responding slowly. Please try again."}
+        except requests.exceptions.RequestException as e:
+            return {"status": "error", "message": f"Network error: {e}"}
+        except (KeyError, TypeError, AttributeError):
+            return {"status": "error", "message": "Unexpected response format from routing API."}
 
     def get_google_maps_url(self, start_coords, end_coords, vehicle):
         """Generate a Google Maps URL for interactive viewing in browser."""
@@ -121,33 +526,62 @@ class RouteAPI:
         return url
 
 class FantasticRouterApp(ctk.CTk):
+    CALCULATE_TEXT = "🚀 CALCULATE ROUTE"
+    CALCULATING_TEXT = "⏳ CALCULATING..."
+    DIRECTIONS_BATCH = 50
+
+    PRIMARY_BLUE = "#1565C0"
+    DARK_BLUE = "#0D47A1"
+    LIGHT_BLUE = "#42A5F5"
+    ACCENT_ORANGE = "#FF6F00"
+    HOVER_ORANGE = "#FF8F00"
+    BG_GRADIENT_START = "#E3F2FD"
+    BG_GRADIENT_END = "#F5F5F5"
+    BG_WHITE = "#FFFFFF"
+    TEXT_DARK = "#212121"
+    TEXT_SECONDARY = "#616161"
+    TEXT_LIGHT = "#FFFFFF"
+    CARD_BG = "#FAFAFA"
+    SUCCESS = "#4CAF50"
+    ERROR = "#F44336"
+    BORDER_LIGHT = "#E0E0E0"
+    SHADOW_COLOR = "#90A4AE"
+
     def __init__(self, api_logic):
         super().__init__()
         self.api_logic = api_logic
-        self.is_calculating = False
         self.current_route_data = None
         self.map_markers = []
+        self.map_widget = None
         self.map_path = None 
-        
-        self.PRIMARY_BLUE = "#1565C0"
-        self.DARK_BLUE = "#0D47A1"
-        self.LIGHT_BLUE = "#42A5F5"
-        self.ACCENT_ORANGE = "#FF6F00"
-        self.HOVER_ORANGE = "#FF8F00"
-        self.BG_GRADIENT_START = "#E3F2FD"
-        self.BG_GRADIENT_END = "#F5F5F5"
-        self.BG_WHITE = "#FFFFFF"
-        self.TEXT_DARK = "#212121"
-        self.TEXT_SECONDARY = "#616161"
-        self.TEXT_LIGHT = "#FFFFFF"
-        self.CARD_BG = "#FAFAFA"
-        self.SUCCESS = "#4CAF50"
-        self.ERROR = "#F44336"
-        self.BORDER_LIGHT = "#E0E0E0"
-        self.SHADOW_COLOR = "#90A4AE"
+        self._last_map_key = None
+        self._tk_thread_id = threading.get_ident()
+        self._pending_ui = {}
+        self._ui_flush_scheduled = False
+        self._ui_lock = threading.Lock()
+        self._route_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="route")
+        self._route_future = None
+        self.api_logic.warm_up()
 
         ctk.set_appearance_mode("Light")
         ctk.set_default_color_theme("blue")
+
+        self.fonts = {
+            "12": ctk.CTkFont(size=12),
+            "13": ctk.CTkFont(size=13),
+            "13_bold": ctk.CTkFont(size=13, weight="bold"),
+            "14": ctk.CTkFont(size=14),
+            "14_bold": ctk.CTkFont(size=14, weight="bold"),
+            "15": ctk.CTkFont(size=15),
+            "15_bold": ctk.CTkFont(size=15, weight="bold"),
+            "17_bold": ctk.CTkFont(size=17, weight="bold"),
+            "18": ctk.CTkFont(size=18),
+            "18_bold": ctk.CTkFont(size=18, weight="bold"),
+            "22_bold": ctk.CTkFont(size=22, weight="bold"),
+            "28_bold": ctk.CTkFont(size=28, weight="bold"),
+            "32_bold": ctk.CTkFont(size=32, weight="bold"),
+            "segoe13": ctk.CTkFont(family="Segoe UI", size=13)
+        }
         
         self.title("Fantastic Tour - Premium Route Planner")
         self.geometry("1400x900")
@@ -160,6 +594,12 @@ class FantasticRouterApp(ctk.CTk):
         self.create_header_frame()
         self.create_main_content_frame()
         self.create_status_bar()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self._route_executor.shutdown(wait=False, cancel_futures=True)
+        self.api_logic.close()
+        self.destroy()
 
     def create_header_frame(self):
         header_frame = ctk.CTkFrame(self, fg_color=self.PRIMARY_BLUE, corner_radius=0, height=110)
@@ -172,28 +612,50 @@ class FantasticRouterApp(ctk.CTk):
         left_section = ctk.CTkFrame(content_frame, fg_color="transparent")
         left_section.pack(side="left", fill="y")
         
-        try:
-            from PIL import Image
-            logo_image = ctk.CTkImage(Image.open("f4_logo.png"), size=(55, 55))
-            logo_label = ctk.CTkLabel(left_section, image=logo_image, text="")
-            logo_label.pack(side="left", padx=(0, 20))
-        except:
-            logo_frame = ctk.CTkFrame(left_section, width=55, height=55, 
-                                     fg_color=self.DARK_BLUE, corner_radius=27)
-            logo_frame.pack(side="left", padx=(0, 20))
-            logo_frame.pack_propagate(False)
-            ctk.CTkLabel(logo_frame, text="F4", font=ctk.CTkFont(size=22, weight="bold"),
-                        text_color=self.TEXT_LIGHT).place(relx=0.5, rely=0.5, anchor="center")
+        logo_frame = ctk.CTkFrame(left_section, width=55, height=55, 
+                                 fg_color=self.DARK_BLUE, corner_radius=27)
+        logo_frame.pack(side="left", padx=(0, 20))
+        logo_frame.pack_propagate(False)
+        placeholder = ctk.CTkLabel(logo_frame, text="F4", font=self.fonts["22_bold"],
+                                   text_color=self.TEXT_LIGHT)
+        placeholder.place(relx=0.5, rely=0.5, anchor="center")
+        logo_future = Future()
+        threading.Thread(target=self._decode_logo, args=(logo_future,), daemon=True).start()
+        self.after(50, self._poll_logo, logo_future, logo_frame, placeholder)
         
         title_section = ctk.CTkFrame(left_section, fg_color="transparent")
         title_section.pack(side="left")
         ctk.CTkLabel(title_section, text="FANTASTIC TOUR",
-                    font=ctk.CTkFont(size=32, weight="bold"),
+                    font=self.fonts["32_bold"],
                     text_color=self.TEXT_LIGHT).pack(anchor="w")
         ctk.CTkLabel(title_section, text="Advanced Route Planning & Navigation System",
-                    font=ctk.CTkFont(size=14),
+                    font=self.fonts["14"],
                     text_color=self.LIGHT_BLUE).pack(anchor="w", pady=(2, 0))
 
+    @staticmethod
+    def _decode_logo(future):
+        """Decode the logo off the GUI thread; the result (or None) is picked up by _poll_logo."""
+        try:
+            from PIL import Image
+            image = Image.open("f4_logo.png")
+            image.load()
+        except Exception:
+            image = None
+        future.set_result(image)
+
+    def _poll_logo(self, future, logo_frame, placeholder):
+        """Runs on the Tk thread until the decoded logo is ready, then swaps it in for the placeholder."""
+        if not future.done():
+            self.after(50, self._poll_logo, future, logo_frame, placeholder)
+            return
+        image = future.result()
+        if image is None:
+            return
+        logo_image = ctk.CTkImage(image, size=(55, 55))
+        placeholder.destroy()
+        logo_frame.configure(fg_color="transparent")
+        ctk.CTkLabel(logo_frame, image=logo_image, text="").place(relx=0.5, rely=0.5, anchor="center")
+
     def create_main_content_frame(self):
         main_frame = ctk.CTkFrame(self, fg_color="transparent")
         main_frame.grid(row=1, column=0, sticky="nsew", padx=35, pady=25)
@@ -216,7 +678,7 @@ class FantasticRouterApp(ctk.CTk):
         header = ctk.CTkFrame(panel, fg_color=self.PRIMARY_BLUE, corner_radius=12, height=60)
         header.grid(row=0, column=0, sticky="ew", padx=25, pady=(25, 20))
         ctk.CTkLabel(header, text="🎯 Route Configuration", 
-                    font=ctk.CTkFont(size=18, weight="bold"),
+                    font=self.fonts["18_bold"],
                     text_color=self.TEXT_LIGHT).pack(pady=15)
         
         origin_section = ctk.CTkFrame(panel, fg_color="transparent")
@@ -225,15 +687,15 @@ class FantasticRouterApp(ctk.CTk):
         
         origin_label_frame = ctk.CTkFrame(origin_section, fg_color="transparent")
         origin_label_frame.grid(row=0, column=0, sticky="w", pady=(0, 10))
-        ctk.CTkLabel(origin_label_frame, text="🏢", font=ctk.CTkFont(size=18)).pack(side="left", padx=(0, 10))
+        ctk.CTkLabel(origin_label_frame, text="🏢", font=self.fonts["18"]).pack(side="left", padx=(0, 10))
         ctk.CTkLabel(origin_label_frame, text="Starting Point", 
-                    font=ctk.CTkFont(size=15, weight="bold"),
+                    font=self.fonts["15_bold"],
                     text_color=self.TEXT_DARK).pack(side="left")
         
         self.start_entry = ctk.CTkEntry(origin_section, 
                                        placeholder_text="Enter starting location (e.g., Manila, Philippines)",
                                        height=50,
-                                       font=ctk.CTkFont(size=14),
+                                       font=self.fonts["14"],
                                        border_width=2,
                                        border_color=self.BORDER_LIGHT,
                                        fg_color=self.CARD_BG,
@@ -246,15 +708,15 @@ class FantasticRouterApp(ctk.CTk):
         
         dest_label_frame = ctk.CTkFrame(dest_section, fg_color="transparent")
         dest_label_frame.grid(row=0, column=0, sticky="w", pady=(0, 10))
-        ctk.CTkLabel(dest_label_frame, text="📍", font=ctk.CTkFont(size=18)).pack(side="left", padx=(0, 10))
+        ctk.CTkLabel(dest_label_frame, text="📍", font=self.fonts["18"]).pack(side="left", padx=(0, 10))
         ctk.CTkLabel(dest_label_frame, text="Destination", 
-                    font=ctk.CTkFont(size=15, weight="bold"),
+                    font=self.fonts["15_bold"],
                     text_color=self.TEXT_DARK).pack(side="left")
         
         self.end_entry = ctk.CTkEntry(dest_section, 
                                      placeholder_text="Enter destination (e.g., Makati City, Philippines)",
                                      height=50,
-                                     font=ctk.CTkFont(size=14),
+                                     font=self.fonts["14"],
                                      border_width=2,
                                      border_color=self.BORDER_LIGHT,
                                      fg_color=self.CARD_BG,
@@ -268,10 +730,11 @@ class FantasticRouterApp(ctk.CTk):
         vehicle_header = ctk.CTkFrame(vehicle_frame, fg_color="transparent")
         vehicle_header.pack(fill="x", padx=25, pady=(20, 15))
         ctk.CTkLabel(vehicle_header, text="🚗 Transportation Mode", 
-                    font=ctk.CTkFont(size=15, weight="bold"),
+                    font=self.fonts["15_bold"],
                     text_color=self.TEXT_DARK).pack(anchor="w")
         
         self.vehicle_var = tkinter.StringVar(value="car")
+        self.selected_vehicle = "car"
         
         vehicles = [
             ("🚗 Car", "car", "Fastest route for driving"),
@@ -287,13 +750,14 @@ class FantasticRouterApp(ctk.CTk):
             option_frame.pack(anchor="w")
             
             ctk.CTkRadioButton(option_frame, text=text, variable=self.vehicle_var, value=value,
-                             font=ctk.CTkFont(size=14, weight="bold"),
+                             font=self.fonts["14_bold"],
                              fg_color=self.PRIMARY_BLUE,
                              hover_color=self.LIGHT_BLUE,
-                             text_color=self.TEXT_DARK).pack(side="left")
+                             text_color=self.TEXT_DARK,
+                             command=lambda v=value: setattr(self, "selected_vehicle", v)).pack(side="left")
             
             ctk.CTkLabel(option_container, text=desc,
-                        font=ctk.CTkFont(size=12),
+                        font=self.fonts["12"],
                         text_color=self.TEXT_SECONDARY).pack(anchor="w", padx=(30, 0))
         
         ctk.CTkFrame(vehicle_frame, fg_color="transparent", height=10).pack()
@@ -303,8 +767,8 @@ class FantasticRouterApp(ctk.CTk):
         
         self.get_route_button = ctk.CTkButton(
             button_container,
-            text="🚀 CALCULATE ROUTE",
-            font=ctk.CTkFont(size=17, weight="bold"),
+            text=self.CALCULATE_TEXT,
+            font=self.fonts["17_bold"],
             fg_color=self.ACCENT_ORANGE,
             hover_color=self.HOVER_ORANGE,
             height=60,
@@ -316,7 +780,7 @@ class FantasticRouterApp(ctk.CTk):
         links_btn = ctk.CTkButton(
             button_container,
             text="🌐 Open in Google Maps",
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=self.fonts["14_bold"],
             fg_color=self.PRIMARY_BLUE,
             hover_color=self.DARK_BLUE,
             height=45,
@@ -343,7 +807,7 @@ class FantasticRouterApp(ctk.CTk):
         header = ctk.CTkFrame(panel, fg_color=self.PRIMARY_BLUE, corner_radius=12, height=60)
         header.grid(row=0, column=0, sticky="ew", padx=25, pady=(25, 20))
         ctk.CTkLabel(header, text="📊 Route Information & Map", 
-                    font=ctk.CTkFont(size=18, weight="bold"),
+                    font=self.fonts["18_bold"],
                     text_color=self.TEXT_LIGHT).pack(pady=15)
 
         summary_container = ctk.CTkFrame(panel, fg_color="transparent")
@@ -354,10 +818,10 @@ class FantasticRouterApp(ctk.CTk):
                                     corner_radius=12, border_width=2, border_color=self.BORDER_LIGHT)
         distance_card.grid(row=0, column=0, sticky="ew", padx=(0, 12))
         ctk.CTkLabel(distance_card, text="📏 Total Distance", 
-                    font=ctk.CTkFont(size=13, weight="bold"),
+                    font=self.fonts["13_bold"],
                     text_color=self.TEXT_SECONDARY).pack(pady=(20, 8))
         self.distance_label = ctk.CTkLabel(distance_card, text="-- km",
-                                        font=ctk.CTkFont(size=28, weight="bold"),
+                                        font=self.fonts["28_bold"],
                                         text_color=self.PRIMARY_BLUE)
         self.distance_label.pack(pady=(0, 20))
 
@@ -365,77 +829,74 @@ class FantasticRouterApp(ctk.CTk):
                                 corner_radius=12, border_width=2, border_color=self.BORDER_LIGHT)
         time_card.grid(row=0, column=1, sticky="ew", padx=(12, 0))
         ctk.CTkLabel(time_card, text="⏱️ Estimated Time", 
-                    font=ctk.CTkFont(size=13, weight="bold"),
+                    font=self.fonts["13_bold"],
                     text_color=self.TEXT_SECONDARY).pack(pady=(20, 8))
         self.time_label = ctk.CTkLabel(time_card, text="-- min",
-                                    font=ctk.CTkFont(size=28, weight="bold"),
+                                    font=self.fonts["28_bold"],
                                     text_color=self.PRIMARY_BLUE)
         self.time_label.pack(pady=(0, 20))
 
         map_header_section = ctk.CTkFrame(panel, fg_color="transparent")
         map_header_section.grid(row=2, column=0, sticky="ew", padx=25, pady=(10, 10))
         ctk.CTkLabel(map_header_section, text="🗺️ Interactive Map View (Expanded)",
-                    font=ctk.CTkFont(size=15, weight="bold"),
+                    font=self.fonts["15_bold"],
                     text_color=self.TEXT_DARK).pack(anchor="w")
 
         map_height = 500
 
-        if MAP_AVAILABLE:
-            map_frame = ctk.CTkFrame(
-                panel,
-                fg_color=self.CARD_BG,
-                corner_radius=10,
-                border_width=2,
-                border_color=self.BORDER_LIGHT,
-                height=map_height
-            )
-            map_frame.grid(row=3, column=0, sticky="ew", padx=25, pady=(10, 20))
-            map_frame.grid_propagate(False)
+        map_frame = ctk.CTkFrame(
+            panel,
+            fg_color=self.CARD_BG,
+            corner_radius=10,
+            border_width=2,
+            border_color=self.BORDER_LIGHT,
+            height=map_height
+        )
+        map_frame.grid(row=3, column=0, sticky="ew", padx=25, pady=(10, 20))
+        map_frame.grid_propagate(False)
+        self._map_frame = map_frame
 
-            self.map_widget = tkintermapview.TkinterMapView(map_frame, corner_radius=8)
-            self.map_widget.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.97, relheight=0.97)
-            self.map_widget.set_position(14.5995, 120.9842)
-            self.map_widget.set_zoom(12)
-        else:
-            map_placeholder = ctk.CTkFrame(
-                panel,
-                fg_color=self.CARD_BG,
-                corner_radius=10,
-                border_width=2,
-                border_color=self.BORDER_LIGHT,
-                height=map_height
-            )
-            map_placeholder.grid(row=3, column=0, sticky="ew", padx=25, pady=(10, 20))
-            map_placeholder.grid_propagate(False)
-            ctk.CTkLabel(
-                map_placeholder,
-                text="📦 Map Widget Not Available\n\nInstall tkintermapview:\npip install tkintermapview",
-                font=ctk.CTkFont(size=15),
-                text_color=self.TEXT_SECONDARY,
-                justify="center"
-            ).place(relx=0.5, rely=0.5, anchor="center")
+        # The map view itself is built by the first update_map call
+        if not MAP_AVAILABLE:
+            self._show_map_placeholder()
 
         directions_section = ctk.CTkFrame(panel, fg_color="transparent")
         directions_section.grid(row=4, column=0, sticky="ew", padx=25, pady=(10, 10))
         ctk.CTkLabel(
             directions_section,
             text="🧭 Turn-by-Turn Directions",
-            font=ctk.CTkFont(size=15, weight="bold"),
+            font=self.fonts["15_bold"],
             text_color=self.TEXT_DARK
         ).pack(anchor="w")
 
-        self.directions_textbox = ctk.CTkTextbox(
+        directions_frame = ctk.CTkFrame(
             panel,
-            state="disabled",
-            font=ctk.CTkFont(family="Segoe UI", size=13),
-            wrap="word",
             fg_color=self.CARD_BG,
+            corner_radius=10,
             border_width=2,
             border_color=self.BORDER_LIGHT,
-            corner_radius=10,
             height=map_height
         )
-        self.directions_textbox.grid(row=5, column=0, sticky="ew", padx=25, pady=(5, 20))
+        directions_frame.grid(row=5, column=0, sticky="ew", padx=25, pady=(5, 20))
+        directions_frame.pack_propagate(False)
+
+        directions_scrollbar = ctk.CTkScrollbar(directions_frame)
+        directions_scrollbar.pack(side="right", fill="y", padx=(0, 6), pady=8)
+
+        self.directions_textbox = tkinter.Text(
+            directions_frame,
+            state="disabled",
+            font=self.fonts["segoe13"],
+            wrap="word",
+            bg=self.CARD_BG,
+            fg=self.TEXT_DARK,
+            relief="flat",
+            bd=0,
+            highlightthickness=0,
+            yscrollcommand=directions_scrollbar.set
+        )
+        self.directions_textbox.pack(side="left", fill="both", expand=True, padx=(12, 0), pady=8)
+        directions_scrollbar.configure(command=self.directions_textbox.yview)
 
     def create_status_bar(self):
         status_frame = ctk.CTkFrame(self, fg_color=self.PRIMARY_BLUE, corner_radius=0, height=45)
@@ -444,12 +905,38 @@ class FantasticRouterApp(ctk.CTk):
         self.status_label = ctk.CTkLabel(
             status_frame,
             text="✓ Ready to calculate routes",
-            font=ctk.CTkFont(size=13),
+            font=self.fonts["13"],
             text_color=self.TEXT_LIGHT,
             anchor="w"
         )
         self.status_label.pack(side="left", padx=50, pady=12)
 
+    def _build_map_widget(self):
+        """Create the map view on first use; it starts loading tiles immediately."""
+        global MAP_AVAILABLE
+        if self.map_widget is not None or not MAP_AVAILABLE:
+            return
+        try:
+            import tkintermapview
+        except ImportError as e:
+            print(f"Note: tkintermapview could not be loaded, embedded map disabled: {e}")
+            MAP_AVAILABLE = False
+            self._show_map_placeholder()
+            return
+        self.map_widget = tkintermapview.TkinterMapView(self._map_frame, corner_radius=8)
+        self.map_widget.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.97, relheight=0.97)
+        self.map_widget.set_position(14.5995, 120.9842)
+        self.map_widget.set_zoom(12)
+
+    def _show_map_placeholder(self):
+        ctk.CTkLabel(
+            self._map_frame,
+            text="📦 Map Widget Not Available\n\nInstall tkintermapview:\npip install tkintermapview",
+            font=self.fonts["15"],
+            text_color=self.TEXT_SECONDARY,
+            justify="center"
+        ).place(relx=0.5, rely=0.5, anchor="center")
+
     def clear_map(self):
         """Clear all markers and paths from the map."""
         if not MAP_AVAILABLE:
@@ -468,13 +955,30 @@ class FantasticRouterApp(ctk.CTk):
             except:
                 pass
             self.map_path = None
+        self._last_map_key = None
+
+    def update_map(self, start_coords, end_coords, path_coords=None):
+        """Update the embedded map with route information.
 
-    def update_map(self, start_coords, end_coords, route_points=None):
-        """Update the embedded map with route information."""
+        path_coords is an already simplified list of (lat, lng) tuples; see
+        calculate_route, which prepares it on the worker thread.
+        """
         if not MAP_AVAILABLE:
             return
-        
+
+        map_key = (
+            round(start_coords['lat'], 5), round(start_coords['lng'], 5),
+            round(end_coords['lat'], 5), round(end_coords['lng'], 5),
+            tuple(path_coords) if path_coords else None,
+        )
+        if map_key == self._last_map_key:
+            return
+
+        self._build_map_widget()
+        if self.map_widget is None:
+            return
         self.clear_map()
+        self._last_map_key = map_key
         
         start_marker = self.map_widget.set_marker(
             start_coords['lat'], 
@@ -494,9 +998,7 @@ class FantasticRouterApp(ctk.CTk):
         )
         self.map_markers.append(end_marker)
         
-        if route_points and len(route_points) > 1:
-            path_coords = [(pt[1], pt[0]) for pt in route_points] 
-            
+        if path_coords and len(path_coords) > 1:
             self.map_path = self.map_widget.set_path(path_coords, color="#2196F3", width=4)
         
         try:
@@ -516,35 +1018,98 @@ class FantasticRouterApp(ctk.CTk):
             self.map_widget.set_position(center_lat, center_lng)
             self.map_widget.set_zoom(10)
 
+    def _run_route_job(self, start_location, end_location, vehicle):
+        try:
+            self.calculate_route(start_location, end_location, vehicle)
+        except Exception:
+            logging.exception("Route calculation failed")
+            self._fail_calculation("Unexpected error while calculating the route.")
+
     def start_route_calculation(self):
-        if self.is_calculating:
+        if self._route_future is not None and not self._route_future.done():
             return
-        threading.Thread(target=self.calculate_route, daemon=True).start()
+        self._route_future = self._route_executor.submit(
+            self._run_route_job, self.start_entry.get(), self.end_entry.get(), self.selected_vehicle
+        )
 
-    def calculate_route(self):
-        self.is_calculating = True
-        self.status_label.configure(text="⏳ Calculating optimal route...")
-        self.get_route_button.configure(state="disabled", text="⏳ CALCULATING...", 
-                                       fg_color=self.TEXT_SECONDARY)
-        
-        start_location = self.start_entry.get()
-        end_location = self.end_entry.get()
-        vehicle = self.vehicle_var.get()
+    def queue_ui_update(self, **fields):
+        """Record widget changes from the worker thread; they are applied together on the Tk thread."""
+        with self._ui_lock:
+            self._pending_ui.update(fields)
+            if self._ui_flush_scheduled:
+                return
+            self._ui_flush_scheduled = True
+        if threading.get_ident() == self._tk_thread_id:
+            self._flush_ui()
+        else:
+            self.after(16, self._flush_ui)
+
+    def _flush_ui(self):
+        with self._ui_lock:
+            pending = self._pending_ui
+            self._pending_ui = {}
+            self._ui_flush_scheduled = False
+
+        if "busy" in pending:
+            if pending["busy"]:
+                self.get_route_button.configure(state="disabled", text=self.CALCULATING_TEXT,
+                                               fg_color=self.TEXT_SECONDARY)
+            else:
+                self.get_route_button.configure(state="normal", text=self.CALCULATE_TEXT,
+                                               fg_color=self.ACCENT_ORANGE)
+        if "status" in pending:
+            self.status_label.configure(text=pending["status"])
+        if "distance" in pending:
+            self.distance_label.configure(text=pending["distance"])
+        if "time" in pending:
+            self.time_label.configure(text=pending["time"])
+        if "directions" in pending:
+            lines = pending["directions"]
+            self.directions_textbox.configure(state="normal")
+            # Text.replace swaps the whole contents in one edit; only long lists are streamed in batches.
+            self.directions_textbox.replace("1.0", "end", "".join(lines[:self.DIRECTIONS_BATCH]))
+            for i in range(self.DIRECTIONS_BATCH, len(lines), self.DIRECTIONS_BATCH):
+                self.update_idletasks()
+                self.directions_textbox.insert("end", "".join(lines[i:i + self.DIRECTIONS_BATCH]))
+            self.directions_textbox.configure(state="disabled")
+        if "map" in pending and MAP_AVAILABLE:
+            # Queued behind the idle redraws of the labels and directions, so those paint first.
+            self.after_idle(self.update_map, *pending["map"])
+        if pending.get("gmaps_enabled"):
+            self.view_gmaps_btn.configure(state="normal")
+
+    def _fail_calculation(self, message):
+        self.queue_ui_update(busy=False, status=f"❌ Error: {message}")
+
+    def calculate_route(self, start_location, end_location, vehicle):
+        self.queue_ui_update(busy=True, status="⏳ Calculating optimal route...")
+
+        for check in (
+            self.api_logic.validate_api_key(),
+            self.api_logic.validate_vehicle_type(vehicle),
+            self.api_logic.validate_location_input(start_location),
+            self.api_logic.validate_location_input(end_location),
+        ):
+            if check["status"] == "error":
+                self._fail_calculation(check["message"])
+                return
+
+        if " ".join(start_location.lower().split()) == " ".join(end_location.lower().split()):
+            self._fail_calculation("Starting point and destination are the same.")
+            return
+
+        start_data, end_data = self.api_logic.geocode_many([start_location, end_location])
 
-        start_data = self.api_logic.geocode(start_location)
         if start_data["status"] == "error":
-            self.is_calculating = False
-            self.status_label.configure(text=f"❌ Error: {start_data['message']}")
-            self.get_route_button.configure(state="normal", text="🚀 CALCULATE ROUTE",
-                                          fg_color=self.ACCENT_ORANGE)
+            self._fail_calculation(start_data["message"])
             return
             
-        end_data = self.api_logic.geocode(end_location)
         if end_data["status"] == "error":
-            self.is_calculating = False
-            self.status_label.configure(text=f"❌ Error: {end_data['message']}")
-            self.get_route_button.configure(state="normal", text="🚀 CALCULATE ROUTE",
-                                          fg_color=self.ACCENT_ORANGE)
+            self._fail_calculation(end_data["message"])
+            return
+
+        if (round(start_data["lat"], 4), round(start_data["lng"], 4)) == (round(end_data["lat"], 4), round(end_data["lng"], 4)):
+            self._fail_calculation("Starting point and destination resolve to the same place.")
             return
 
         route_data = self.api_logic.get_route(
@@ -554,59 +1119,50 @@ class FantasticRouterApp(ctk.CTk):
         )
         
         if route_data["status"] == "error":
-            self.is_calculating = False
-            self.status_label.configure(text=f"❌ Error: {route_data['message']}")
-            self.get_route_button.configure(state="normal", text="🚀 CALCULATE ROUTE",
-                                          fg_color=self.ACCENT_ORANGE)
+            self._fail_calculation(route_data["message"])
             return
 
         path = route_data["data"]["paths"][0]
-        distance_km = path["distance"] / 1000
-        time_min = path["time"] / 60000
-        instructions = path["instructions"]
+        try:
+            distance_km = float(path["distance"]) / 1000
+            time_min = float(path["time"]) / 60000
+        except (KeyError, TypeError, ValueError):
+            self._fail_calculation("Route response is missing distance or time.")
+            return
+        instructions = path.get("instructions", [])
         
         route_points = None
+        path_coords = None
         if "points" in path and "coordinates" in path["points"]:
             route_points = path["points"]["coordinates"]
+            path_coords = [(pt[1], pt[0]) for pt in simplify_path(route_points)]
         
         self.current_route_data = {
             "start_coords": {"lat": start_data["lat"], "lng": start_data["lng"]},
             "end_coords": {"lat": end_data["lat"], "lng": end_data["lng"]},
             "route_points": route_points,
-            "vehicle": vehicle
+            "vehicle": vehicle,
+            "gmaps_url": self.api_logic.get_google_maps_url(start_data, end_data, vehicle)
         }
         
-        if MAP_AVAILABLE:
-            self.after(0, lambda: self.update_map(
-                self.current_route_data["start_coords"],
-                self.current_route_data["end_coords"],
-                route_points
-            ))
-        
-        self.distance_label.configure(text=f"{distance_km:.2f} km")
-        
         if time_min >= 60:
             hours = int(time_min // 60)
             mins = int(time_min % 60)
-            self.time_label.configure(text=f"{hours}h {mins}m")
+            time_text = f"{hours}h {mins}m"
         else:
-            self.time_label.configure(text=f"{time_min:.0f} min")
-        
-        directions_text = ""
-        for i, inst in enumerate(instructions, 1):
-            directions_text += f"{i}. {inst['text']}\n"
+            time_text = f"{time_min:.0f} min"
         
-        self.directions_textbox.configure(state="normal")
-        self.directions_textbox.delete("1.0", "end")
-        self.directions_textbox.insert("1.0", directions_text)
-        self.directions_textbox.configure(state="disabled")
+        directions_lines = [f"{i}. {inst['text']}\n" for i, inst in enumerate(instructions, 1)]
 
-        self.view_gmaps_btn.configure(state="normal")
-
-        self.status_label.configure(text=f"✓ Route calculated! Distance: {distance_km:.2f} km • Time: {time_min:.0f} min")
-        self.get_route_button.configure(state="normal", text="🚀 CALCULATE ROUTE",
-                                       fg_color=self.ACCENT_ORANGE)
-        self.is_calculating = False
+        self.queue_ui_update(
+            busy=False,
+            status=f"✓ Route calculated! Distance: {distance_km:.2f} km • Time: {time_min:.0f} min",
+            distance=f"{distance_km:.2f} km",
+            time=time_text,
+            directions=directions_lines,
+            map=(self.current_route_data["start_coords"], self.current_route_data["end_coords"], path_coords),
+            gmaps_enabled=True
+        )
     
     def open_google_maps(self):
         """Open route in Google Maps."""
@@ -615,13 +1171,9 @@ class FantasticRouterApp(ctk.CTk):
             return
         
         try:
-            url = self.api_logic.get_google_maps_url(
-                self.current_route_data["start_coords"],
-                self.current_route_data["end_coords"],
-                self.current_route_data["vehicle"]
-            )
-            webbrowser.open(url)
-            self.status_label.configure(text="✓ Route opened in Google Maps!")
+            import webbrowser
+            webbrowser.open(self.current_route_data["gmaps_url"])
+            self.queue_ui_update(status="✓ Route opened in Google Maps!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open Google Maps: {str(e)}")
 
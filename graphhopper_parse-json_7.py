@@ -1,36 +1,133 @@
+import os
+import atexit
+import functools
+import json
+import re
+import shelve
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import urllib.parse
 import sys
-from colorama import init, Fore, Back, Style
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-# Initialize colorama for cross-platform colored terminal text
-init(autoreset=True)
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+if sys.stdout.isatty():
+    from colorama import init, Fore
+    # Initialize colorama for cross-platform colored terminal text
+    init(autoreset=True)
+else:
+    class Fore:
+        """Empty colour codes, so redirected output carries no escape sequences"""
+        BLUE = CYAN = GREEN = MAGENTA = RED = WHITE = YELLOW = ""
+
+MILES_PER_METER = 0.000621371
+FEET_PER_METER = 3.28084
+# Cyan separator lines used throughout the screens
+DOUBLE_RULE = Fore.CYAN + "=" * 70
+SINGLE_RULE = Fore.CYAN + "-" * 70
+SHORT_RULE = Fore.CYAN + "-" * 40
+GEOCODE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mapquest_geocode")
+GEOCODE_CACHE_TTL = 7 * 24 * 3600
+GEOCODE_CACHE_SIZE = 256
+HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".mapquest_history")
+# Colour codes inside an input() prompt, and whether readline is editing that prompt
+ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;]*m")
+readline_active = False
+
+def ask(prompt):
+    """input() with a coloured prompt; under readline the escape codes are marked zero-width"""
+    if readline_active:
+        prompt = ANSI_ESCAPE_RE.sub(lambda m: "\001" + m.group(0) + "\002", prompt)
+    return input(prompt)
+
+@functools.lru_cache(maxsize=1024)
+def _format_distance(meters, unit_system):
+    """Cached formatter behind MapQuestEnhanced.format_distance; step distances repeat often"""
+    if unit_system == "metric":
+        if meters >= 1000:
+            return f"{meters/1000:.1f} km"
+        else:
+            return f"{meters:.0f} m"
+    else:  # imperial
+        miles = meters * MILES_PER_METER
+        if miles >= 0.1:
+            return f"{miles:.1f} miles"
+        else:
+            feet = meters * FEET_PER_METER
+            return f"{feet:.0f} ft"
 
 class MapQuestEnhanced:
+    # (keyword, icon) pairs checked in order against the lowered instruction text
+    ICON_RULES = (("arrived", "🛑"), ("turn", "↷"), ("continue", "↑"))
+    DEFAULT_ICON = "📍"
+    VEHICLE_ICONS = {"car": "🚗", "bike": "🚲", "foot": "🚶"}
+    QUIT_WORDS = frozenset(("quit", "q", "exit"))
+    NO_WORDS = frozenset(("no", "n"))
+    # Step, icon, instruction and distance columns of the directions table
+    ROW_FORMAT = (Fore.WHITE + "{:<4} {} {:<37} " + Fore.GREEN + "{:<15}").format
+
     def __init__(self):
         self.route_url = "https://graphhopper.com/api/1/route?"
         self.key = "560ec147-2865-4947-b87c-7d70228cbd08"
+        # Query parts that never change, so each request only encodes its own values
+        self._geocode_base = "https://graphhopper.com/api/1/geocode?" + urllib.parse.urlencode({
+            "limit": "1",
+            "key": self.key
+        }) + "&q="
+        # Instructions only come back with calc_points on; the geometry is already an encoded polyline
+        self._route_base = self.route_url + urllib.parse.urlencode({
+            "key": self.key
+        }) + "&"
         self.unit_system = "metric"  # Default unit system
-        self.vehicle_profiles = ["car", "bike", "foot"]
+        self.vehicle_profiles = ("car", "bike", "foot")  # display order
+        self.valid_vehicles = frozenset(self.vehicle_profiles)
+        # One keep-alive session so geocoding and routing reuse the TLS connection
+        self.session = requests.Session()
+        # Back off on 429/5xx (honouring Retry-After); timeouts fail at once so the Timeout branch still reports them
+        retries = Retry(total=3, connect=0, read=False, status=3, backoff_factor=0.3,
+                        status_forcelist=(429, 500, 502, 503, 504), allowed_methods={"GET"},
+                        respect_retry_after_header=True, raise_on_status=False)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
+        self.session.headers.update({"Accept-Encoding": "gzip", "Connection": "keep-alive"})
+        # Origin and destination are geocoded side by side
+        self.geocode_pool = ThreadPoolExecutor(max_workers=2)
+        self._print_lock = threading.Lock()
+        # Successful geocodes: in-memory LRU backed by a shelve file that survives restarts
+        self._geo_cache = OrderedDict()
+        self._geo_lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(GEOCODE_CACHE_PATH), exist_ok=True)
+            self._geo_disk = shelve.open(GEOCODE_CACHE_PATH)
+        except Exception:
+            self._geo_disk = None
         
     def display_welcome(self):
         """Display welcome message and application header"""
-        print(Fore.CYAN + "=" * 70)
+        print(DOUBLE_RULE)
         print(Fore.YELLOW + "🚗 MAPQUEST ENHANCED ROUTE PLANNER 🗺️")
-        print(Fore.CYAN + "=" * 70)
+        print(DOUBLE_RULE)
         print(Fore.WHITE + "Plan your journey with detailed directions and multiple options!")
         print()
     
     def get_unit_preference(self):
         """Allow user to choose between metric and imperial units"""
         print(Fore.GREEN + "📏 UNIT SELECTION")
-        print(Fore.CYAN + "-" * 40)
+        print(SHORT_RULE)
         print(Fore.WHITE + "1. Metric System (kilometers, meters)")
         print(Fore.WHITE + "2. Imperial System (miles, feet)")
-        print(Fore.CYAN + "-" * 40)
+        print(SHORT_RULE)
         
         while True:
-            choice = input(Fore.YELLOW + "Choose unit system (1 or 2): ").strip()
+            choice = ask(Fore.YELLOW + "Choose unit system (1 or 2): ").strip()
             if choice == "1":
                 self.unit_system = "metric"
                 print(Fore.GREEN + "✓ Metric system selected")
@@ -45,25 +142,14 @@ class MapQuestEnhanced:
     
     def format_distance(self, meters):
         """Format distance based on selected unit system"""
-        if self.unit_system == "metric":
-            if meters >= 1000:
-                return f"{meters/1000:.1f} km"
-            else:
-                return f"{meters:.0f} m"
-        else:  # imperial
-            miles = meters / 1609.34
-            if miles >= 0.1:
-                return f"{miles:.1f} miles"
-            else:
-                feet = meters * 3.28084
-                return f"{feet:.0f} ft"
+        return _format_distance(meters, self.unit_system)
     
     def format_time(self, milliseconds):
         """Format time duration in a readable format"""
-        total_seconds = milliseconds / 1000
-        hours = int(total_seconds // 3600)
-        minutes = int((total_seconds % 3600) // 60)
-        seconds = int(total_seconds % 60)
+        seconds = int(milliseconds // 1000)
+        hours = seconds // 3600
+        minutes = seconds // 60 % 60
+        seconds %= 60
         
         if hours > 0:
             return f"{hours}h {minutes:02d}m {seconds:02d}s"
@@ -75,29 +161,61 @@ class MapQuestEnhanced:
     def display_vehicle_options(self):
         """Display available vehicle profiles"""
         print(Fore.GREEN + "🚗 VEHICLE PROFILES")
-        print(Fore.CYAN + "-" * 40)
+        print(SHORT_RULE)
         for i, profile in enumerate(self.vehicle_profiles, 1):
-            icon = "🚗" if profile == "car" else "🚲" if profile == "bike" else "🚶"
+            icon = self.VEHICLE_ICONS.get(profile, self.DEFAULT_ICON)
             print(Fore.WHITE + f"{i}. {icon} {profile.capitalize()}")
-        print(Fore.CYAN + "-" * 40)
+        print(SHORT_RULE)
+    
+    def _say(self, text):
+        """Print a whole line at once; geocoding runs on two threads"""
+        with self._print_lock:
+            print(text)
+    
+    def _cached_geocode(self, key):
+        """Return a stored (status, lat, lng, name) result for key, or None"""
+        with self._geo_lock:
+            result = self._geo_cache.get(key)
+            if result is not None:
+                self._geo_cache.move_to_end(key)
+                return result
+            if self._geo_disk is None:
+                return None
+            stored = self._geo_disk.get(key)
+            if stored is None or stored[0] < time.time():
+                return None
+            self._geo_cache[key] = stored[1]
+            if len(self._geo_cache) > GEOCODE_CACHE_SIZE:
+                self._geo_cache.popitem(last=False)
+            return stored[1]
+    
+    def _store_geocode(self, key, result):
+        with self._geo_lock:
+            self._geo_cache[key] = result
+            if len(self._geo_cache) > GEOCODE_CACHE_SIZE:
+                self._geo_cache.popitem(last=False)
+            if self._geo_disk is not None:
+                self._geo_disk[key] = (time.time() + GEOCODE_CACHE_TTL, result)
+                self._geo_disk.sync()
     
     def geocoding(self, location):
         """Enhanced geocoding with better error handling"""
         if not location or location.strip() == "":
-            print(Fore.RED + "❌ Error: Location cannot be empty")
+            self._say(Fore.RED + "❌ Error: Location cannot be empty")
             return None, None, None, None
         
-        geocode_url = "https://graphhopper.com/api/1/geocode?"
-        url = geocode_url + urllib.parse.urlencode({
-            "q": location, 
-            "limit": "1", 
-            "key": self.key
-        })
+        cache_key = " ".join(location.casefold().split())
+        cached = self._cached_geocode(cache_key)
+        if cached is not None:
+            self._say(Fore.GREEN + f"✓ Found: {cached[3]} (cached)")
+            return cached
+        
+        url = self._geocode_base + urllib.parse.quote_plus(location)
         
         try:
-            print(Fore.BLUE + f"🔍 Searching for: {location}")
-            replydata = requests.get(url, timeout=10)
-            json_data = replydata.json()
+            self._say(Fore.BLUE + f"🔍 Searching for: {location}")
+            replydata = self.session.get(url, timeout=10)
+            json_data = json_loads(replydata.content)
             json_status = replydata.status_code
             
             if json_status == 200 and len(json_data["hits"]) != 0:
@@ -117,21 +235,23 @@ class MapQuestEnhanced:
                 else:
                     new_loc = name
                 
-                print(Fore.GREEN + f"✓ Found: {new_loc} ({value})")
-                return json_status, lat, lng, new_loc
+                self._say(Fore.GREEN + f"✓ Found: {new_loc} ({value})")
+                result = (json_status, lat, lng, new_loc)
+                self._store_geocode(cache_key, result)
+                return result
             else:
                 if json_status != 200:
                     error_msg = json_data.get("message", "Unknown error")
-                    print(Fore.RED + f"❌ Geocoding API Error {json_status}: {error_msg}")
+                    self._say(Fore.RED + f"❌ Geocoding API Error {json_status}: {error_msg}")
                 else:
-                    print(Fore.RED + f"❌ No results found for: {location}")
+                    self._say(Fore.RED + f"❌ No results found for: {location}")
                 return None, None, None, None
                 
         except requests.exceptions.RequestException as e:
-            print(Fore.RED + f"❌ Network error: {str(e)}")
+            self._say(Fore.RED + f"❌ Network error: {str(e)}")
             return None, None, None, None
         except Exception as e:
-            print(Fore.RED + f"❌ Unexpected error: {str(e)}")
+            self._say(Fore.RED + f"❌ Unexpected error: {str(e)}")
             return None, None, None, None
     
     def display_route_summary(self, paths_data, orig_name, dest_name, vehicle):
@@ -143,49 +263,55 @@ class MapQuestEnhanced:
         distance = paths_data["paths"][0]["distance"]
         time_ms = paths_data["paths"][0]["time"]
         
-        print(Fore.CYAN + "=" * 70)
-        print(Fore.YELLOW + f"📍 ROUTE SUMMARY: {orig_name} → {dest_name}")
-        print(Fore.CYAN + "=" * 70)
-        
         # Create formatted summary table
         summary_data = [
-            ["Vehicle", f"{'🚗' if vehicle == 'car' else '🚲' if vehicle == 'bike' else '🚶'} {vehicle.upper()}"],
+            ["Vehicle", f"{self.VEHICLE_ICONS.get(vehicle, self.DEFAULT_ICON)} {vehicle.upper()}"],
             ["Total Distance", self.format_distance(distance)],
             ["Estimated Time", self.format_time(time_ms)],
             ["Unit System", "Metric" if self.unit_system == "metric" else "Imperial"]
         ]
         
-        for item in summary_data:
-            print(Fore.WHITE + f"{item[0]:<20} {Fore.GREEN}{item[1]}")
-        
-        print(Fore.CYAN + "=" * 70)
+        # Written as one block instead of one print per row
+        lines = [
+            DOUBLE_RULE,
+            Fore.YELLOW + f"📍 ROUTE SUMMARY: {orig_name} → {dest_name}",
+            DOUBLE_RULE,
+        ]
+        lines += [Fore.WHITE + f"{item[0]:<20} {Fore.GREEN}{item[1]}" for item in summary_data]
+        lines.append(DOUBLE_RULE)
+        print("\n".join(lines))
     
     def display_detailed_directions(self, paths_data):
         """Display step-by-step directions in a formatted table"""
         instructions = paths_data["paths"][0]["instructions"]
         
-        print(Fore.YELLOW + "📋 TURN-BY-TURN DIRECTIONS")
-        print(Fore.CYAN + "-" * 70)
-        print(Fore.WHITE + f"{'Step':<4} {'Instruction':<40} {'Distance':<15}")
-        print(Fore.CYAN + "-" * 70)
+        lines = [
+            Fore.YELLOW + "📋 TURN-BY-TURN DIRECTIONS",
+            SINGLE_RULE,
+            Fore.WHITE + f"{'Step':<4} {'Instruction':<40} {'Distance':<15}",
+            SINGLE_RULE,
+        ]
         
         for i, instruction in enumerate(instructions, 1):
             text = instruction["text"]
             distance = self.format_distance(instruction["distance"])
             
             # Add icons based on instruction type
-            icon = "🛑" if "arrived" in text.lower() else "↷" if "turn" in text.lower() else "↑" if "continue" in text.lower() else "📍"
+            low = text.lower()
+            icon = next((ic for kw, ic in self.ICON_RULES if kw in low), self.DEFAULT_ICON)
             
-            print(Fore.WHITE + f"{i:<4} {icon} {text:<37} {Fore.GREEN}{distance:<15}")
+            lines.append(self.ROW_FORMAT(i, icon, text, distance))
         
-        print(Fore.CYAN + "-" * 70)
+        lines.append(SINGLE_RULE)
+        # One write for the whole table instead of a flushed print per step
+        print("\n".join(lines))
     
     def get_user_input(self, prompt, allow_quit=True):
         """Get user input with quit option"""
         quit_msg = Fore.MAGENTA + " (or 'quit' to exit)" if allow_quit else ""
-        user_input = input(Fore.YELLOW + f"{prompt}{quit_msg}: ").strip()
+        user_input = ask(Fore.YELLOW + f"{prompt}{quit_msg}: ").strip()
         
-        if allow_quit and user_input.lower() in ['quit', 'q', 'exit']:
+        if allow_quit and user_input.casefold() in self.QUIT_WORDS:
             return None
         return user_input
     
@@ -195,9 +321,9 @@ class MapQuestEnhanced:
         self.get_unit_preference()
         
         while True:
-            print(Fore.CYAN + "\n" + "=" * 70)
+            print("\n" + DOUBLE_RULE)
             print(Fore.YELLOW + "🆕 NEW ROUTE PLANNING")
-            print(Fore.CYAN + "=" * 70)
+            print(DOUBLE_RULE)
             
             # Vehicle selection
             self.display_vehicle_options()
@@ -205,68 +331,92 @@ class MapQuestEnhanced:
             if vehicle_input is None:
                 break
             
-            vehicle = vehicle_input.lower()
-            if vehicle not in self.vehicle_profiles:
+            vehicle = vehicle_input.casefold()
+            if vehicle not in self.valid_vehicles:
                 print(Fore.YELLOW + "⚠️  Invalid vehicle profile. Using 'car' as default.")
                 vehicle = "car"
             
-            # Starting location
+            # Starting location and destination
             start_loc = self.get_user_input("Starting location")
             if start_loc is None:
                 break
             
-            orig = self.geocoding(start_loc)
-            if orig[0] is None:  # Error in geocoding
-                print(Fore.RED + "❌ Please try again with a different starting location.")
-                continue
-            
-            # Destination
             dest_loc = self.get_user_input("Destination")
             if dest_loc is None:
                 break
             
-            dest = self.geocoding(dest_loc)
+            orig, dest = self.geocode_pool.map(self.geocoding, (start_loc, dest_loc))
+            if orig[0] is None:  # Error in geocoding
+                print(Fore.RED + "❌ Please try again with a different starting location.")
+                continue
+            
             if dest[0] is None:  # Error in geocoding
                 print(Fore.RED + "❌ Please try again with a different destination.")
                 continue
             
             # Get route data
-            print(Fore.BLUE + "\n📡 Calculating route...")
-            try:
-                op = "&point=" + str(orig[1]) + "%2C" + str(orig[2])
-                dp = "&point=" + str(dest[1]) + "%2C" + str(dest[2])
-                paths_url = self.route_url + urllib.parse.urlencode({
-                    "key": self.key, 
-                    "vehicle": vehicle
-                }) + op + dp
+            if orig[1:3] == dest[1:3]:
+                # Identical points give a zero-length route, so skip the request
+                print(Fore.YELLOW + "⚠️  Start and end locations are the same!")
+            else:
+                print(Fore.BLUE + "\n📡 Calculating route...")
+                try:
+                    # A list of pairs keeps both repeated point parameters in one encoded query
+                    paths_url = self._route_base + urllib.parse.urlencode([
+                        ("vehicle", vehicle),
+                        ("point", f"{orig[1]},{orig[2]}"),
+                        ("point", f"{dest[1]},{dest[2]}"),
+                    ])
                 
-                response = requests.get(paths_url, timeout=15)
-                paths_status = response.status_code
-                paths_data = response.json()
+                    response = self.session.get(paths_url, timeout=15)
+                    paths_status = response.status_code
+                    paths_data = json_loads(response.content)
                 
-                if paths_status == 200:
-                    self.display_route_summary(paths_data, orig[3], dest[3], vehicle)
-                    self.display_detailed_directions(paths_data)
-                else:
-                    error_msg = paths_data.get("message", "Unknown routing error")
-                    print(Fore.RED + f"❌ Routing API Error {paths_status}: {error_msg}")
+                    if paths_status == 200:
+                        self.display_route_summary(paths_data, orig[3], dest[3], vehicle)
+                        self.display_detailed_directions(paths_data)
+                    else:
+                        error_msg = paths_data.get("message", "Unknown routing error")
+                        print(Fore.RED + f"❌ Routing API Error {paths_status}: {error_msg}")
                     
-            except requests.exceptions.Timeout:
-                print(Fore.RED + "❌ Request timeout. Please check your connection and try again.")
-            except requests.exceptions.RequestException as e:
-                print(Fore.RED + f"❌ Network error: {str(e)}")
-            except Exception as e:
-                print(Fore.RED + f"❌ Unexpected error: {str(e)}")
+                except requests.exceptions.Timeout:
+                    print(Fore.RED + "❌ Request timeout. Please check your connection and try again.")
+                except requests.exceptions.RequestException as e:
+                    print(Fore.RED + f"❌ Network error: {str(e)}")
+                except Exception as e:
+                    print(Fore.RED + f"❌ Unexpected error: {str(e)}")
             
             # Ask if user wants to plan another route
-            print(Fore.CYAN + "\n" + "=" * 70)
+            print("\n" + DOUBLE_RULE)
             continue_choice = self.get_user_input("Plan another route? (yes/no)", allow_quit=False)
-            if continue_choice and continue_choice.lower() in ['no', 'n']:
+            if continue_choice and continue_choice.casefold() in self.NO_WORDS:
                 print(Fore.GREEN + "👋 Thank you for using MapQuest 2.0")
                 break
 
+def enable_input_history():
+    """Give input() line editing and a history that persists between runs"""
+    global readline_active
+    try:
+        import readline
+    except ImportError:  # e.g. Windows without pyreadline3
+        return
+    readline_active = True
+    try:
+        readline.read_history_file(HISTORY_PATH)
+    except OSError:
+        pass
+    readline.set_history_length(500)
+    
+    def save_history():
+        try:
+            readline.write_history_file(HISTORY_PATH)
+        except OSError:
+            pass
+    atexit.register(save_history)
+
 def main():
     """Main entry point with error handling"""
+    enable_input_history()
     try:
         app = MapQuestEnhanced()
         app.main_flow()
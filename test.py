@@ -1,10 +1,28 @@
+import importlib
+import io
+import json
 import pytest
+import requests
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
-from fantasticTour import RouteAPI 
+from fantasticTour import RouteAPI, DiskCache, simplify_path, decode_polyline
+
+cli_module = importlib.import_module("graphhopper_parse-json_7")
+
+@pytest.fixture
+def api(tmp_path):
+    return RouteAPI(cache_dir=tmp_path)
 
 @pytest.fixture
-def api():
-    return RouteAPI()
+def cli(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli_module, "GEOCODE_CACHE_PATH", str(tmp_path / "geocode"))
+    app = cli_module.MapQuestEnhanced()
+    yield app
+    app.geocode_pool.shutdown()
+    app._geo_disk.close()
 
 def test_validate_api_key_missing(monkeypatch, api):
     monkeypatch.setattr(api, "key", None)
@@ -47,40 +65,41 @@ def test_validate_vehicle_type_success(api):
     result = api.validate_vehicle_type("car")
     assert result["status"] == "success"
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_geocode_success(mock_get, api):
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response.iter_content.return_value = [json.dumps({
         "hits": [
             {"point": {"lat": 14.5995, "lng": 120.9842}, "name": "Manila", "country": "Philippines", "state": "NCR"}
         ]
-    }
+    }).encode()]
     mock_get.return_value = mock_response
     api.key = "mock_key"
     result = api.geocode("Manila")
     assert result["status"] == "success"
     assert result["lat"] == 14.5995
     assert result["lng"] == 120.9842
+    assert result["name"] == "Manila, NCR, Philippines"
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_geocode_no_results(mock_get, api):
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {"hits": []}
+    mock_response.iter_content.return_value = [json.dumps({"hits": []}).encode()]
     mock_get.return_value = mock_response
     api.key = "mock_key"
     result = api.geocode("Unknown Place")
     assert result["status"] == "error"
     assert "No results" in result["message"]
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_get_route_success(mock_get, api):
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {
+    mock_response.iter_content.return_value = [json.dumps({
         "paths": [{"distance": 5000, "time": 600000, "points": {"coordinates": [[120.98, 14.60], [121.00, 14.61]]}}]
-    }
+    }).encode()]
     mock_get.return_value = mock_response
     api.key = "mock_key"
     start = {"lat": 14.6, "lng": 120.98}
@@ -104,3 +123,453 @@ def test_get_google_maps_url(api):
     assert "bicycling" in url
     assert "origin=14.6,120.98" in url
     assert "destination=14.61,121.0" in url
+
+@patch("requests.Session.get")
+def test_geocode_cached_by_normalized_query(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({
+        "hits": [{"point": {"lat": 14.5995, "lng": 120.9842}, "name": "Manila"}]
+    }).encode()]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    first = api.geocode("Manila")
+    second = api.geocode("  manila ")
+    assert first == second
+    assert mock_get.call_count == 1
+
+@patch("requests.Session.get")
+def test_get_route_cached_for_same_points(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({"paths": [{"distance": 5000, "time": 600000}]}).encode()]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    start = {"lat": 14.6, "lng": 120.98}
+    end = {"lat": 14.61, "lng": 121.00}
+    api.get_route(start, end, "car")
+    api.get_route(start, end, "car")
+    api.get_route(start, end, "foot")
+    assert mock_get.call_count == 2
+
+@patch("requests.Session.get")
+def test_geocode_read_timeout(mock_get, api):
+    mock_get.side_effect = requests.exceptions.ReadTimeout()
+    api.key = "mock_key"
+    result = api.geocode("Manila")
+    assert result["status"] == "error"
+    assert "slowly" in result["message"]
+
+@patch("requests.Session.get")
+def test_get_route_http_error_message(mock_get, api):
+    mock_response = requests.Response()
+    mock_response.status_code = 400
+    mock_response.reason = "Bad Request"
+    mock_response.raw = io.BytesIO(json.dumps({"message": "Cannot find point 1"}).encode())
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.get_route({"lat": 14.6, "lng": 120.98}, {"lat": 14.61, "lng": 121.0}, "car")
+    assert result["status"] == "error"
+    assert "400" in result["message"]
+    assert "Cannot find point 1" in result["message"]
+
+@patch("requests.Session.get")
+def test_geocode_disk_cache_survives_new_instance(mock_get, tmp_path):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({
+        "hits": [{"point": {"lat": 14.5995, "lng": 120.9842}, "name": "Manila"}]
+    }).encode()]
+    mock_get.return_value = mock_response
+    first = RouteAPI(cache_dir=tmp_path)
+    first.key = "mock_key"
+    first.geocode("Manila")
+    second = RouteAPI(cache_dir=tmp_path)
+    second.key = "mock_key"
+    result = second.geocode("Manila")
+    assert result["lat"] == 14.5995
+    assert mock_get.call_count == 1
+
+@patch("requests.Session.get")
+def test_geocode_many_preserves_order(mock_get, api):
+    def respond(url, timeout, stream):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        lat = 1.0 if "Manila" in url else 2.0
+        mock_response.iter_content.return_value = [json.dumps({"hits": [{"point": {"lat": lat, "lng": 120.0}, "name": "X"}]}).encode()]
+        return mock_response
+    mock_get.side_effect = respond
+    api.key = "mock_key"
+    results = api.geocode_many(["Manila", "Makati"])
+    assert [r["lat"] for r in results] == [1.0, 2.0]
+
+@patch("requests.Session.get")
+def test_geocode_unauthorized_message(mock_get, api):
+    mock_response = requests.Response()
+    mock_response.status_code = 401
+    mock_response._content = b"{}"
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.geocode("Manila")
+    assert result["status"] == "error"
+    assert "Invalid API key" in result["message"]
+
+@patch("requests.Session.get")
+def test_geocode_invalid_json(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [b"<html>oops</html>"]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.geocode("Manila")
+    assert result["status"] == "error"
+    assert "Invalid JSON" in result["message"]
+
+@patch("requests.Session.get")
+def test_geocode_many_coalesces_duplicates(mock_get, api, monkeypatch):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({"hits": [{"point": {"lat": 1.0, "lng": 2.0}, "name": "X"}]}).encode()]
+    all_missed = threading.Event()
+    misses = []
+    cache_get = api._cache_get
+
+    def counting_cache_get(*args):
+        result = cache_get(*args)
+        misses.append(args[1])
+        if len(misses) == 3:
+            all_missed.set()
+        return result
+
+    def respond(url, timeout, stream):
+        # Hold the request open until every caller has missed the cache and reached the in-flight registry
+        assert all_missed.wait(timeout=5)
+        time.sleep(0.1)
+        return mock_response
+
+    monkeypatch.setattr(api, "_cache_get", counting_cache_get)
+    mock_get.side_effect = respond
+    api.key = "mock_key"
+    results = api.geocode_many(["Manila", "manila", "MANILA "])
+    assert all(r["status"] == "success" for r in results)
+    assert mock_get.call_count == 1
+
+@patch("requests.Session.get")
+def test_geocode_name_skips_missing_state(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({
+        "hits": [{"point": {"lat": 48.85, "lng": 2.35}, "name": "Paris", "country": "France"}]
+    }).encode()]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.geocode("Paris")
+    assert result["name"] == "Paris, France"
+
+def test_get_route_non_numeric_coords(api):
+    api.key = "mock_key"
+    result = api.get_route({"lat": "abc", "lng": 120.98}, {"lat": 14.6, "lng": 121.0}, "car")
+    assert result["status"] == "error"
+    assert "Non-numeric" in result["message"]
+
+@patch("requests.Session.get")
+def test_get_multi_route_single_request(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({"paths": [{"distance": 9000, "time": 900000}]}).encode()]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    stops = [{"lat": 14.6, "lng": 120.98}, {"lat": 14.61, "lng": 121.0}, {"lat": 14.55, "lng": 121.02}]
+    result = api.get_multi_route(stops, "car")
+    assert result["status"] == "success"
+    assert mock_get.call_count == 1
+    assert mock_get.call_args[0][0].count("&point=") == 3
+
+def test_get_multi_route_needs_two_points(api):
+    api.key = "mock_key"
+    result = api.get_multi_route([{"lat": 14.6, "lng": 120.98}], "car")
+    assert result["status"] == "error"
+
+@patch("requests.Session.get")
+def test_get_route_summary_only_skips_geometry(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({"paths": [{"distance": 5000, "time": 600000}]}).encode()]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    api.get_route({"lat": 14.6, "lng": 120.98}, {"lat": 14.61, "lng": 121.0}, "car", summary_only=True)
+    url = mock_get.call_args[0][0]
+    assert "calc_points=false" in url
+    assert "instructions=false" in url
+
+@patch("requests.Session.get")
+def test_geocode_memory_cache_expires(mock_get, monkeypatch):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({"hits": [{"point": {"lat": 1.0, "lng": 2.0}, "name": "X"}]}).encode()]
+    mock_get.return_value = mock_response
+    monkeypatch.setattr("fantasticTour.CACHE_TTL", -1)
+    api = RouteAPI(cache_dir=None)
+    api.key = "mock_key"
+    api.geocode("Manila")
+    api.geocode("Manila")
+    assert mock_get.call_count == 2
+
+def test_simplify_path_keeps_endpoints_and_limit():
+    points = [[120.0 + i * 1e-4, 14.0 + (i % 7) * 1e-5] for i in range(2001)]
+    thinned = simplify_path(points, max_points=100)
+    assert len(thinned) <= 100
+    assert thinned[0] == points[0]
+    assert thinned[-1] == points[-1]
+    assert simplify_path(points[:50], max_points=100) == points[:50]
+
+def test_simplify_path_keeps_the_corner():
+    leg_one = [[120.0 + i * 1e-3, 14.0] for i in range(100)]
+    leg_two = [[120.099, 14.0 + i * 1e-3] for i in range(1, 100)]
+    thinned = simplify_path(leg_one + leg_two, max_points=3)
+    assert thinned == [leg_one[0], leg_one[-1], leg_two[-1]]
+
+def test_decode_polyline():
+    points = decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@")
+    assert points == [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+
+@patch("requests.Session.get")
+def test_get_route_decodes_encoded_points(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.iter_content.return_value = [json.dumps({
+        "paths": [{"distance": 5000, "time": 600000, "points_encoded": True, "points": "_p~iF~ps|U_ulLnnqC"}]
+    }).encode()]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.get_route({"lat": 14.6, "lng": 120.98}, {"lat": 14.61, "lng": 121.0}, "car")
+    assert result["data"]["paths"][0]["points"]["coordinates"] == [[-120.2, 38.5], [-120.95, 40.7]]
+
+@patch("requests.Session.get")
+def test_geocode_stops_reading_oversized_body(mock_get, api, monkeypatch):
+    monkeypatch.setattr("fantasticTour.MAX_RESPONSE_BYTES", 10)
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
+    mock_response.iter_content.return_value = [b"{\"hits\":", b" [] }     "]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.geocode("Manila")
+    assert result == {"status": "error", "message": "Geocoding response is too large."}
+    mock_response.close.assert_called_once()
+
+def test_route_api_uses_injected_session(tmp_path):
+    session = MagicMock()
+    session.get.return_value.headers = {}
+    session.get.return_value.iter_content.return_value = [b'{"hits": []}']
+    api = RouteAPI(cache_dir=tmp_path, session=session)
+    api.key = "mock_key"
+    api.geocode("Manila")
+    assert session.get.call_count == 1
+
+def test_geocode_read_timeout_is_not_retried(api, monkeypatch):
+    requests_seen = []
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            time.sleep(1.0)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        monkeypatch.setattr("fantasticTour.GEOCODE_TIMEOUT", (1.0, 0.3))
+        api.session.mount("http://", api.session.get_adapter("https://"))
+        api.key = "mock_key"
+        api.geocode_url = f"http://127.0.0.1:{server.server_address[1]}/geocode?"
+        started = time.monotonic()
+        result = api.geocode("Manila")
+        elapsed = time.monotonic() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert result["message"] == "Geocoding server is responding slowly. Please try again."
+    assert len(requests_seen) == 1
+    assert elapsed < 1.0
+
+def test_changing_endpoint_after_key_updates_request_urls(api):
+    api.key = "mock_key"
+    api.geocode_url = "http://localhost/geocode?"
+    api.route_url = "http://localhost/route?"
+    assert api._geocode_prefix == "http://localhost/geocode?limit=1&key=mock_key&q="
+    assert api._route_prefix["car"].startswith("http://localhost/route?key=mock_key&vehicle=car")
+
+def test_route_api_does_not_warm_up_on_construction(tmp_path):
+    session = MagicMock()
+    RouteAPI(cache_dir=tmp_path, session=session)
+    session.head.assert_not_called()
+
+def test_close_leaves_injected_session_open(tmp_path):
+    session = MagicMock()
+    RouteAPI(cache_dir=tmp_path, session=session).close()
+    session.close.assert_not_called()
+    own = RouteAPI(cache_dir=tmp_path)
+    with patch.object(own.session, "close") as close:
+        own.close()
+    close.assert_called_once()
+
+def test_disk_cache_deletes_expired_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, ttl=-1)
+    for i in range(5):
+        cache.set(f"k{i}", {"i": i})
+    assert cache.get("k0") is None
+    cache.close()
+    reopened = DiskCache(path)
+    assert reopened._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 0
+    reopened.close()
+
+def test_disk_hit_keeps_its_remaining_ttl(tmp_path):
+    api = RouteAPI(cache_dir=tmp_path, session=MagicMock())
+    api._disk_cache.ttl = 60
+    api._cache_put(api._geo_cache, "manila", {"status": "success"}, 8)
+    api._geo_cache.clear()
+    assert api._cache_get(api._geo_cache, "manila", 8) == {"status": "success"}
+    expires, _ = api._geo_cache["manila"]
+    assert expires - time.monotonic() <= 60
+
+@patch("requests.Session.get")
+def test_geocode_ignores_malformed_content_length(mock_get, api):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {"Content-Length": "not-a-number"}
+    mock_response.iter_content.return_value = [json.dumps({"hits": [{"point": {"lat": 1.0, "lng": 2.0}, "name": "X"}]}).encode()]
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.geocode("Manila")
+    assert result["status"] == "success"
+
+@patch("requests.Session.get")
+def test_http_error_message_falls_back_to_reason(mock_get, api):
+    for body in (b"<html>oops</html>", b"[]"):
+        mock_response = requests.Response()
+        mock_response.status_code = 502
+        mock_response.reason = "Bad Gateway"
+        mock_response.raw = io.BytesIO(body)
+        mock_get.return_value = mock_response
+        api.key = "mock_key"
+        result = api.geocode(f"Manila {len(body)}")
+        assert result["message"].endswith("returned status code 502: Bad Gateway")
+
+@patch("requests.Session.get")
+def test_http_error_message_skips_oversized_body(mock_get, api):
+    mock_response = requests.Response()
+    mock_response.status_code = 500
+    mock_response.reason = "Internal Server Error"
+    mock_response.headers["Content-Length"] = str(10 * 1024 * 1024)
+    mock_response.raw = MagicMock()
+    mock_get.return_value = mock_response
+    api.key = "mock_key"
+    result = api.geocode("Manila")
+    assert result["message"].endswith("returned status code 500: Internal Server Error")
+    mock_response.raw.read.assert_not_called()
+
+def test_cli_read_timeout_is_not_retried(cli):
+    requests_seen = []
+
+    class SlowHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            time.sleep(1.0)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        cli.session.mount("http://", cli.session.get_adapter("https://"))
+        with pytest.raises(requests.exceptions.Timeout):
+            cli.session.get(f"http://127.0.0.1:{server.server_address[1]}/route?", timeout=(1.0, 0.3))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(requests_seen) == 1
+
+def _cli_response(status, payload):
+    response = MagicMock()
+    response.status_code = status
+    response.content = json.dumps(payload).encode()
+    return response
+
+def _cli_hit(lat, lng, name):
+    return {"hits": [{"point": {"lat": lat, "lng": lng}, "name": name, "osm_value": "city", "country": "PH"}]}
+
+def test_cli_geocode_cache_normalizes_key(cli):
+    cli.session.get = MagicMock(return_value=_cli_response(200, _cli_hit(14.6, 121.0, "Manila")))
+    first = cli.geocoding("Manila  City")
+    second = cli.geocoding("  manila CITY ")
+    assert first == second == (200, 14.6, 121.0, "Manila, PH")
+    assert cli.session.get.call_count == 1
+
+def test_cli_geocode_disk_entry_expires(cli, monkeypatch):
+    result = (200, 14.6, 121.0, "Manila, PH")
+    cli._store_geocode("manila", result)
+    cli._geo_cache.clear()
+    assert cli._cached_geocode("manila") == result
+    monkeypatch.setattr(cli_module, "GEOCODE_CACHE_TTL", -1)
+    cli._store_geocode("cebu", result)
+    cli._geo_cache.clear()
+    assert cli._cached_geocode("cebu") is None
+
+def test_cli_geocode_failure_is_not_cached(cli):
+    cli.session.get = MagicMock(return_value=_cli_response(200, {"hits": []}))
+    assert cli.geocoding("Nowhere") == (None, None, None, None)
+    assert cli.geocoding("Nowhere") == (None, None, None, None)
+    assert cli.session.get.call_count == 2
+    assert "nowhere" not in cli._geo_cache
+
+def test_cli_ask_marks_escape_codes_zero_width(monkeypatch):
+    prompts = []
+    monkeypatch.setattr("builtins.input", lambda prompt: prompts.append(prompt) or "")
+    monkeypatch.setattr(cli_module, "readline_active", True)
+    cli_module.ask("\x1b[33mRoute?\x1b[0m ")
+    monkeypatch.setattr(cli_module, "readline_active", False)
+    cli_module.ask("\x1b[33mRoute?\x1b[0m ")
+    assert prompts == ["\001\x1b[33m\002Route?\001\x1b[0m\002 ", "\x1b[33mRoute?\x1b[0m "]
+
+@pytest.mark.parametrize("meters, unit_system, expected", [
+    (1500, "metric", "1.5 km"),
+    (250, "metric", "250 m"),
+    (1609.344, "imperial", "1.0 miles"),
+    (30, "imperial", "98 ft"),
+])
+def test_cli_format_distance(meters, unit_system, expected):
+    assert cli_module._format_distance(meters, unit_system) == expected
+
+def _run_cli_route(cli, monkeypatch, start, dest):
+    answers = iter(["1", "car", start, dest, "no"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    cli.main_flow()
+    return [c.args[0] for c in cli.session.get.call_args_list if "/route?" in c.args[0]]
+
+def test_cli_skips_route_request_for_identical_points(cli, monkeypatch, capsys):
+    cli.session.get = MagicMock(return_value=_cli_response(200, _cli_hit(14.6, 121.0, "Manila")))
+    assert _run_cli_route(cli, monkeypatch, "Manila", "Manila City") == []
+    assert "Start and end locations are the same!" in capsys.readouterr().out
+
+def test_cli_route_url_parameters(cli, monkeypatch, capsys):
+    hits = {"Manila": _cli_hit(14.6, 121.0, "Manila"), "Cebu": _cli_hit(10.3, 123.9, "Cebu")}
+    route = {"paths": [{"distance": 570000, "time": 36000000,
+                        "instructions": [{"text": "Arrive at destination", "distance": 0}]}]}
+
+    def respond(url, timeout):
+        if "/route?" in url:
+            return _cli_response(200, route)
+        return _cli_response(200, hits["Manila" if "Manila" in url else "Cebu"])
+
+    cli.session.get = MagicMock(side_effect=respond)
+    (route_url,) = _run_cli_route(cli, monkeypatch, "Manila", "Cebu")
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(route_url).query)
+    assert query == {"key": [cli.key], "vehicle": ["car"], "point": ["14.6,121.0", "10.3,123.9"]}
+    assert "TURN-BY-TURN DIRECTIONS" in capsys.readouterr().out